@@ -136,82 +136,142 @@ exclusion_keywords = {
     "Patangrao Kadam", "Centre for PG Studies", "D. Y. Patil Education Society"
 }
 
+# Normalize a name the same way affiliation text is normalized before matching
+def normalize(text):
+    return text.lower().replace("-", " ")
+
+# Fixed category order for per-department tallies ("Other" marks unmatched rows)
+department_categories = sorted(valid_departments) + ["Other"]
+
+# Build the matchers once per server process; Streamlit re-executes this script on every
+# rerun, so module-level construction would otherwise be repeated on each interaction.
+@st.cache_resource
+def build_matchers():
+    # Exact department names and aliases, normalized once, mapped to their standard name
+    lookup = {normalize(dept): dept for dept in valid_departments}
+    lookup.update(
+        (normalize(alias), standard_dept) for alias, standard_dept in department_aliases.items()
+    )
+
+    # Precompiled alternations so each segment is scanned once instead of once per keyword.
+    # The department pattern is a lookahead tried at every position, longest name first,
+    # so overlapping names (e.g. "Dept. of Electronics" / "Electronics Engineering") all match.
+    exclusions = re.compile("|".join(re.escape(excl.lower()) for excl in exclusion_keywords))
+    departments = re.compile(
+        "(?=(" + "|".join(re.escape(name) for name in sorted(lookup, key=len, reverse=True)) + "))"
+    )
+    return lookup, exclusions, departments
+
+department_lookup, exclusion_pattern, department_pattern = build_matchers()
+
 # Extract department information from affiliation
 def extract_department(affiliation_text):
     if not isinstance(affiliation_text, str) or pd.isna(affiliation_text):
         return "Other"
 
-    departments = set()
-    for segment in affiliation_text.lower().replace("-", " ").split(";"):
+    # Insertion-ordered dict: O(1) dedup and a stable order in the joined output
+    departments = {}
+    for segment in normalize(affiliation_text).split(";"):
         segment = segment.strip()
 
         # Skip segment if any exclusion keyword is found
-        if any(excl.lower() in segment for excl in exclusion_keywords):
+        if exclusion_pattern.search(segment):
             continue
 
-        # Check for exact matches
-        for dept in valid_departments:
-            if dept.lower().replace("-", " ") in segment:
-                departments.add(dept)
-
-        # Check for alias matches
-        for alias, standard_dept in department_aliases.items():
-            if alias.lower().replace("-", " ") in segment:
-                departments.add(standard_dept)
+        # Check exact names and aliases in a single pass
+        for match in department_pattern.finditer(segment):
+            departments[department_lookup[match.group(1)]] = None
 
     return "; ".join(departments) if departments else "Other"
 
-# Process CSV file
+# Identify affiliation column
+def find_affiliation_column(df):
+    return next((col for col in ["Affiliations", "Authors with affiliations"] if col in df.columns), None)
+
+# Compute department statistics efficiently
+def process_department_stats(df):
+    # Count each distinct department combination once, then split only those
+    # combinations and sum their counts per department
+    combos = df["Department"].value_counts().rename_axis("Department").reset_index(name="Papers")
+    combos["Department"] = combos["Department"].str.split(";")
+    all_departments = combos.explode("Department")
+    all_departments["Department"] = pd.Categorical(
+        all_departments["Department"].str.strip(), categories=department_categories
+    )
+    stats = all_departments.groupby("Department", observed=True, sort=False)["Papers"].sum()
+    stats = stats.sort_values(ascending=False).reset_index()
+    stats["Department"] = stats["Department"].astype(str)
+    return stats
+
+# Parse an upload, tag departments and compute the statistics in one call, cached on the
+# uploaded bytes so Streamlit reruns reuse both results without hashing any DataFrame.
+# Errors are reported by process_file since cached functions emit no UI.
+@st.cache_data(show_spinner=False)
+def load_departments(file_bytes):
+    df = pd.read_csv(BytesIO(file_bytes))
+    affil_column = find_affiliation_column(df)
+    if not affil_column:
+        return df, None, None
+
+    # Exports repeat the same affiliation strings across papers, so tag each distinct
+    # string once and spread the results back through the factorized codes. Missing
+    # values get code -1, which picks the trailing "Other" entry.
+    codes, affiliations = pd.factorize(df[affil_column])
+    tagged = pd.Index([extract_department(text) for text in affiliations] + ["Other"], dtype=object)
+    tag_codes, departments = tagged.factorize()
+    df["Department"] = pd.Categorical.from_codes(
+        tag_codes[codes], categories=departments
+    ).remove_unused_categories()
+    return df, affil_column, process_department_stats(df)
+
+# Process CSV file; returns the processed frame and its department statistics
 def process_file(file):
-    file.seek(0)
     try:
-        df = pd.read_csv(file)
+        df, affil_column, stats = load_departments(file.getvalue())
     except pd.errors.EmptyDataError:
         st.error("The uploaded CSV file is empty. Please upload a valid CSV file with data.")
         return None
 
-    # Identify affiliation column
-    affil_column = next((col for col in ["Affiliations", "Authors with affiliations"] if col in df.columns), None)
     if not affil_column:
         st.error("CSV must contain either 'Affiliations' or 'Authors with affiliations' column.")
         return None
 
-    df["Department"] = df[affil_column].apply(extract_department)
-    
     st.write("### Debug Output (First 10 Rows)")
     st.write(df[[affil_column, "Department"]].head(10))
 
-    return df
+    return df, stats
 
-# Compute department statistics efficiently
-def process_department_stats(df):
-    all_departments = df["Department"].str.split(";").explode().str.strip()
-    stats = all_departments.value_counts().reset_index()
-    stats.columns = ["Department", "Papers"]
-    return stats
+# Export results to Excel, cached on the uploaded bytes so reruns reuse the workbook
+@st.cache_data(show_spinner=False)
+def build_excel(file_bytes):
+    processed_df, _, stats_df = load_departments(file_bytes)
+    towrite = BytesIO()
+    with pd.ExcelWriter(towrite, engine="xlsxwriter") as writer:
+        processed_df.to_excel(writer, sheet_name="Affiliations", index=False)
+        stats_df.to_excel(writer, sheet_name="Statistics", index=False)
+    return towrite.getvalue()
 
 # Process and display results
 if uploaded_file:
-    processed_df = process_file(uploaded_file)
-    if processed_df is not None:
+    result = process_file(uploaded_file)
+    if result is not None:
+        processed_df, stats_df = result
         st.header("Processed Affiliation Data")
-        st.dataframe(processed_df)
+        # st.dataframe serializes every column it is given, and exports often carry dozens,
+        # so show the key columns unless asked; the Excel download still has them all
+        if st.checkbox("Show all columns"):
+            st.dataframe(processed_df)
+        else:
+            shown_columns = ["Authors", "Title", "Year", find_affiliation_column(processed_df), "Department"]
+            st.dataframe(processed_df[[col for col in shown_columns if col in processed_df.columns]])
 
-        stats_df = process_department_stats(processed_df)
         st.header("Department Statistics")
         st.dataframe(stats_df)
         st.bar_chart(stats_df.set_index("Department")["Papers"])
 
-        # Export results to Excel
-        towrite = BytesIO()
-        with pd.ExcelWriter(towrite, engine="xlsxwriter") as writer:
-            processed_df.to_excel(writer, sheet_name="Affiliations", index=False)
-            stats_df.to_excel(writer, sheet_name="Statistics", index=False)
-        towrite.seek(0)
-
         st.download_button(
             "Download Processed Data",
-            data=towrite,
+            data=build_excel(uploaded_file.getvalue()),
             file_name="processed_data.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )